@@ -1,64 +1,114 @@
 from __future__ import annotations
 
-import json
+import atexit
+import functools
+import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import orjson
 from flask import Flask, jsonify, request
 
+from app.storage import write_atomic
+
 app = Flask(__name__, static_folder="static", static_url_path="")
 
 STATE_PATH = Path("workspace_state.json")
 DEFAULT_STATE: Dict[str, object] = {"beats": []}
 
 
-def load_state() -> Dict:
+def _read_state_file() -> Dict:
     if not STATE_PATH.exists():
-        STATE_PATH.write_text(json.dumps(DEFAULT_STATE, indent=2))
-        return json.loads(STATE_PATH.read_text())
-    with STATE_PATH.open() as handle:
-        return json.load(handle)
+        STATE_PATH.write_bytes(orjson.dumps(DEFAULT_STATE))
+    try:
+        return orjson.loads(STATE_PATH.read_bytes())
+    except orjson.JSONDecodeError:
+        return {"beats": []}
+
+
+STATE_LOCK = threading.RLock()
+FLUSH_INTERVAL = 0.2
+_STATE: Dict = _read_state_file()
+_BEAT_INDEX: Dict[str, Dict] = {}
+_DIRTY = threading.Event()
+_WRITE_LOCK = threading.Lock()
+
+
+def _reindex_beats() -> None:
+    _BEAT_INDEX.clear()
+    for beat in _STATE.get("beats", []):
+        _BEAT_INDEX.setdefault(beat.get("id"), beat)
+
+
+_reindex_beats()
+
+
+def load_state() -> Dict:
+    return _STATE
 
 
 def save_state(state: Dict) -> None:
-    STATE_PATH.write_text(json.dumps(state, indent=2))
+    with STATE_LOCK:
+        if state is not _STATE:
+            _STATE.clear()
+            _STATE.update(state)
+        _reindex_beats()
+        _DIRTY.set()
+
+
+def flush_state() -> None:
+    with _WRITE_LOCK:
+        with STATE_LOCK:
+            if not _DIRTY.is_set():
+                return
+            _DIRTY.clear()
+            payload = orjson.dumps(_STATE)
+        try:
+            write_atomic(STATE_PATH, payload)
+        except Exception:
+            _DIRTY.set()
+            raise
+
+
+def _flush_loop() -> None:
+    while True:
+        _DIRTY.wait()
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush_state()
+        except Exception:
+            app.logger.exception("Failed to write %s; retrying", STATE_PATH)
+
+
+threading.Thread(target=_flush_loop, daemon=True).start()
+atexit.register(flush_state)
+
+
+_VARIANT_TEMPLATES = (
+    ("v1", "safe_anchor", "Safe Anchor", "Safe/Anchor system prompt using persona '{persona}' with context: {context}"),
+    ("v2", "tool_heavy", "Tool Heavy", "Tool-forward prompt for {tool} with context: {context}"),
+    ("v3", "wildcard", "Wildcard", "Wildcard exploratory prompt with persona '{persona}' and context: {context}"),
+)
 
 
 def generate_variants(beat_text: str, context: Optional[str], persona: str, tool: Optional[str]) -> List[Dict]:
     base_context = context or "(no prior context)"
-    prompts = [
-        {
-            "label": "safe_anchor",
-            "prompt": f"Safe/Anchor system prompt using persona '{persona}' with context: {base_context}",
-        },
+    fields = {"persona": persona, "tool": tool or "unspecified tool", "context": base_context}
+    draft_tail = f"] Persona: {persona}. Tool: {tool or 'general tooling'}. Context: {base_context}. Draft: {beat_text}"
+    return [
         {
-            "label": "tool_heavy",
-            "prompt": f"Tool-forward prompt for {tool or 'unspecified tool'} with context: {base_context}",
-        },
-        {
-            "label": "wildcard",
-            "prompt": f"Wildcard exploratory prompt with persona '{persona}' and context: {base_context}",
-        },
+            "id": variant_id,
+            "type": label,
+            "system_prompt": template.format_map(fields),
+            "text": "[" + title + draft_tail,
+        }
+        for variant_id, label, title, template in _VARIANT_TEMPLATES
     ]
 
-    variants = []
-    for idx, prompt in enumerate(prompts, start=1):
-        suffix = tool or "general tooling"
-        text = (
-            f"[{prompt['label'].replace('_', ' ').title()}] "
-            f"Persona: {persona}. Tool: {suffix}. Context: {base_context}. Draft: {beat_text}"
-        )
-        variants.append(
-            {
-                "id": f"v{idx}",
-                "type": prompt["label"],
-                "system_prompt": prompt["prompt"],
-                "text": text,
-            }
-        )
-    return variants
-
 
+@functools.lru_cache(maxsize=4096)
 def summarize(text: str) -> str:
     if not text:
         return ""
@@ -82,17 +132,27 @@ def resolve_selected_text(beat: Dict) -> Optional[str]:
 
 
 def propagate_contexts(beats: List[Dict]) -> None:
-    previous_text: Optional[str] = None
-    previous_summary: Optional[str] = None
+    previous: Optional[str] = None
 
     for beat in beats:
-        beat["context"] = previous_text or previous_summary
-        summary = beat.get("summary") or summarize(beat.get("text", ""))
+        get = beat.get
+        beat["context"] = previous
+        summary = get("summary") or summarize(get("text", ""))
         beat["summary"] = summary
 
-        selected_text = resolve_selected_text(beat)
-        previous_text = selected_text
-        previous_summary = summary
+        selected_text = get("final_text")
+        if not selected_text and not get("manual_override"):
+            variant_id = get("selected_variant")
+            if variant_id:
+                for variant in get("variants", ()):
+                    if variant["id"] == variant_id:
+                        selected_text = variant["text"]
+                        break
+        previous = selected_text or summary
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 def chain_context(beats: List[Dict]) -> List[Dict]:
@@ -102,8 +162,8 @@ def chain_context(beats: List[Dict]) -> List[Dict]:
 
     for beat in beats:
         context = previous_text or previous_summary
-        persona = beat.get("persona") or "Anchor"
-        tool = beat.get("tool")
+        persona = _intern(beat.get("persona") or "Anchor")
+        tool = _intern(beat.get("tool"))
 
         variants = generate_variants(beat.get("text", ""), context, persona, tool)
         summary = beat.get("summary") or summarize(beat.get("text", ""))
@@ -137,27 +197,29 @@ def create_job():
     beats = payload.get("beats", [])
 
     chained_beats = chain_context(beats)
-    state = load_state()
-    state["beats"] = chained_beats
-    propagate_contexts(state["beats"])
-    save_state(state)
-
-    return jsonify({"beats": chained_beats})
+    with STATE_LOCK:
+        state = load_state()
+        state["beats"] = chained_beats
+        propagate_contexts(state["beats"])
+        save_state(state)
+        return jsonify({"beats": chained_beats})
 
 
 @app.route("/api/state", methods=["GET"])
 def get_state():
-    return jsonify(load_state())
+    with STATE_LOCK:
+        return jsonify(load_state())
 
 
 @app.route("/api/beats/<beat_id>/select", methods=["POST"])
 def select_variant(beat_id: str):
     payload = request.get_json(force=True)
     variant_id = payload.get("variant_id")
-    state = load_state()
+    with STATE_LOCK:
+        state = load_state()
 
-    for beat in state.get("beats", []):
-        if beat.get("id") == beat_id:
+        beat = _BEAT_INDEX.get(beat_id)
+        if beat is not None:
             beat["selected_variant"] = variant_id
             beat["manual_override"] = False
             beat["operator_choice"] = "variant"
@@ -168,31 +230,30 @@ def select_variant(beat_id: str):
                     break
             beat["final_text"] = variant_text
             beat["summary"] = beat.get("summary") or summarize(variant_text or "")
-            break
 
-    propagate_contexts(state.get("beats", []))
-    save_state(state)
-    return jsonify(state)
+        propagate_contexts(state.get("beats", []))
+        save_state(state)
+        return jsonify(state)
 
 
 @app.route("/api/beats/<beat_id>/reject_all", methods=["POST"])
 def reject_all(beat_id: str):
     payload = request.get_json(force=True)
     operator_text = payload.get("operator_text", "")
-    state = load_state()
+    with STATE_LOCK:
+        state = load_state()
 
-    for beat in state.get("beats", []):
-        if beat.get("id") == beat_id:
+        beat = _BEAT_INDEX.get(beat_id)
+        if beat is not None:
             beat["manual_override"] = True
             beat["operator_choice"] = "manual_override"
             beat["final_text"] = operator_text
             beat["selected_variant"] = None
             beat["summary"] = summarize(operator_text)
-            break
 
-    propagate_contexts(state.get("beats", []))
-    save_state(state)
-    return jsonify(state)
+        propagate_contexts(state.get("beats", []))
+        save_state(state)
+        return jsonify(state)
 
 
 @app.route("/")
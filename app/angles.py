@@ -1,13 +1,18 @@
 """Comedic angle generation and queue emulation."""
 from __future__ import annotations
 
+import functools
 import itertools
-import uuid
+import secrets
 from dataclasses import dataclass
 from typing import Dict, List, Sequence
 
 from app.toolkit import Tool
 
+_EDGY_TAGS = frozenset({"satire", "parody", "hyperbole", "breaking-the-fourth-wall"})
+_ID_PREFIX = secrets.token_hex(4)
+_id_counter = itertools.count(1)
+
 
 @dataclass
 class ComedicAngle:
@@ -29,19 +34,32 @@ class ComedicAngle:
         }
 
 
+def _next_angle_id() -> str:
+    return f"{_ID_PREFIX}-{next(_id_counter)}"
+
+
 def _build_prompt(role: str, context: str, tool: Tool) -> str:
+    return _render_prompt(str(role), str(context), tool.name, tool.core_principle, tool.examples[0])
+
+
+@functools.lru_cache(maxsize=256)
+def _render_prompt(role: str, context: str, tool_name: str, core_principle: str, example: str) -> str:
     return (
         f"Role: {role}\n"
         f"Context: {context}\n"
-        f"Tool: {tool.name}\n"
-        f"Core principle: {tool.core_principle}\n"
-        f"Example: {tool.examples[0]}"
+        f"Tool: {tool_name}\n"
+        f"Core principle: {core_principle}\n"
+        f"Example: {example}"
     )
 
 
+@functools.lru_cache(maxsize=512)
+def _principle_body(core_principle: str) -> str:
+    return core_principle.split(":", 1)[-1].strip()
+
+
 def _risk_score(tool: Tool, context: str) -> float:
-    edgy_tags = {"satire", "parody", "hyperbole", "breaking-the-fourth-wall"}
-    bonus = 0.25 if edgy_tags.intersection(tool.tags) else 0
+    bonus = 0.25 if _EDGY_TAGS.intersection(tool.tags) else 0
     length_penalty = min(len(context) / 500, 0.5)
     return min(1.0, 0.4 + bonus + length_penalty)
 
@@ -54,23 +72,27 @@ def generate_comedic_angles(
     contrarian: bool = False,
 ) -> List[ComedicAngle]:
     angles: List[ComedicAngle] = []
-    tool_cycle = itertools.cycle(tools)
+    tool_seq = tuple(tools)
+    if not tool_seq:
+        return angles
+    snapshots = [tool.as_dict() for tool in tool_seq[:count]]
+    unexpected = " contrarian left-turn" if contrarian else ""
 
-    for _ in range(count):
-        tool = next(tool_cycle)
+    for idx in range(count):
+        position = idx % len(tool_seq)
+        tool = tool_seq[position]
         prompt = _build_prompt(role, context, tool)
-        unexpected = " contrarian left-turn" if contrarian else ""
         angle_text = (
             f"Have {role} lean on {tool.name} to solve the problem with a{unexpected} twist: "
-            f"{tool.core_principle.split(':', 1)[-1].strip()}"
+            f"{_principle_body(tool.core_principle)}"
         )
         risk = _risk_score(tool, context)
         angles.append(
             ComedicAngle(
-                id=str(uuid.uuid4()),
+                id=_next_angle_id(),
                 prompt=prompt,
                 angle=angle_text,
-                tool=tool.__dict__,
+                tool=snapshots[position],
                 risk_score=risk,
             )
         )
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, Tuple
 
 
 @dataclass(frozen=True)
@@ -19,7 +19,7 @@ class Archetype:
     """An archetype with a name and ordered beat slots."""
 
     name: str
-    slots: List[BeatSlot]
+    slots: Tuple[BeatSlot, ...]
     description: str
 
 
@@ -27,7 +27,7 @@ def _heroic_insight() -> Archetype:
     return Archetype(
         name="Heroic Insight",
         description="Opens with context, uses a compelling clip, and lands a takeaway.",
-        slots=[
+        slots=(
             BeatSlot(
                 name="Setup",
                 suggested_duration_sec=120,
@@ -43,7 +43,7 @@ def _heroic_insight() -> Archetype:
                 suggested_duration_sec=180,
                 guidance="Narrated reflection or call to action to close the segment.",
             ),
-        ],
+        ),
     )
 
 
@@ -51,7 +51,7 @@ def _conflict_resolution() -> Archetype:
     return Archetype(
         name="Conflict & Resolution",
         description="Contrasts a problem clip with a visual solution, with a bridge between.",
-        slots=[
+        slots=(
             BeatSlot(
                 name="Setup",
                 suggested_duration_sec=90,
@@ -72,7 +72,7 @@ def _conflict_resolution() -> Archetype:
                 suggested_duration_sec=240,
                 guidance="Show the fix; reinforce key lines with visuals and ambient audio.",
             ),
-        ],
+        ),
     )
 
 
@@ -80,7 +80,7 @@ def _micro_doc() -> Archetype:
     return Archetype(
         name="Micro Doc",
         description="Lean docu-style piece with intro, primary beat, and outro tag.",
-        slots=[
+        slots=(
             BeatSlot(
                 name="Setup",
                 suggested_duration_sec=75,
@@ -96,7 +96,7 @@ def _micro_doc() -> Archetype:
                 suggested_duration_sec=90,
                 guidance="Sponsor tag or CTA; includes graphic/text overlay cues.",
             ),
-        ],
+        ),
     )
 
 
@@ -106,10 +106,13 @@ ALL_ARCHETYPES: Dict[str, Archetype] = {
 }
 
 
-def available_archetypes() -> List[str]:
-    """Return the list of archetype names."""
+_ARCHETYPE_NAMES: Tuple[str, ...] = tuple(ALL_ARCHETYPES)
 
-    return list(ALL_ARCHETYPES)
+
+def available_archetypes() -> Tuple[str, ...]:
+    """Return the archetype names as a shared, immutable tuple."""
+
+    return _ARCHETYPE_NAMES
 
 
 def get_archetype(name: str) -> Archetype:
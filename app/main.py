@@ -1,27 +1,41 @@
 from __future__ import annotations
 
-import copy
-import json
+import asyncio
+import atexit
+import contextlib
+import itertools
+import logging
+import os
+import re
+import secrets
 import threading
-import uuid
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from queue import Queue
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
+import orjson
 from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
+
+from app.queues import rehome_queue
+from app.storage import write_atomic
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------
 # Cluster ingestion models
 # ----------------------------
 
 CLUSTER_STATE_FILE = Path("cluster_state.json")
-CLUSTER_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+CLUSTER_HISTORY_FILE = Path("cluster_history.jsonl")
+CLUSTER_RECORDS_FILE = Path("cluster_records.jsonl")
 
 
 class RepresentativeClip(BaseModel):
@@ -31,10 +45,19 @@ class RepresentativeClip(BaseModel):
     url: Optional[str] = Field(None, description="Playback URL")
     thumbnail_url: Optional[str] = Field(None, description="Preview image URL")
     is_garbled: bool = Field(False, description="Flag when transcript is unusable")
+    _is_unusable: bool = PrivateAttr(False)
+
+    def __init__(__pydantic_self__, **data: Any) -> None:
+        super().__init__(**data)
+        __pydantic_self__._is_unusable = __pydantic_self__.is_garbled or __pydantic_self__.transcript_is_missing()
 
     def transcript_is_missing(self) -> bool:
         return not self.transcript.strip()
 
+    @property
+    def is_unusable(self) -> bool:
+        return self._is_unusable
+
 
 class ClusterPayload(BaseModel):
     cluster_id: str = Field(..., description="Unique identifier for the cluster")
@@ -50,27 +73,54 @@ class ClusterPayload(BaseModel):
     representative_clips: List[RepresentativeClip] = Field(
         default_factory=list, description="Clips that represent the cluster"
     )
+    _derived: Dict[str, Any] = PrivateAttr(default_factory=dict)
 
-    @validator("visual_tags", pre=True, always=True)
+    @validator("visual_tags", pre=True)
     def dedupe_visual_tags(cls, value: List[str]) -> List[str]:
         if value is None:
             return []
         deduped: List[str] = []
+        seen = set()
         for tag in value:
             normalized = tag.strip()
-            if normalized and normalized.lower() not in {t.lower() for t in deduped}:
+            key = normalized.lower()
+            if normalized and key not in seen:
+                seen.add(key)
                 deduped.append(normalized)
         return deduped
 
-    @validator("representative_clips", pre=True, always=True)
+    @validator("representative_clips", pre=True)
     def ensure_clips_list(cls, value: Optional[List[RepresentativeClip]]) -> List[RepresentativeClip]:
         return value or []
 
+    def _memoized(self, key: str, compute: Callable[["ClusterPayload"], Any]) -> Any:
+        if key not in self._derived:
+            self._derived[key] = compute(self)
+        return self._derived[key]
+
+    @property
+    def market_movement(self) -> bool:
+        return self._memoized("market_movement", detect_market_movement)
+
+    @property
+    def visual_texture(self) -> Dict[str, List[str]]:
+        return self._memoized("visual_texture", derive_visual_texture)
+
+    @property
+    def neutral_fact_card(self) -> Optional[str]:
+        return self._memoized("neutral_fact_card", lambda cluster: neutralize_fact_card(cluster.fact_card))
+
 
 GROWTH_THRESHOLD = 20.0
 TOTAL_VIEWS_THRESHOLD = 50_000
 ACCELERATION_THRESHOLD = 1.2
 SENTIMENT_GATE = -0.1
+_SENTENCE_RE = re.compile(r"[^.]+")
+BIASED_MARKERS = frozenset({"should", "must", "terrible", "amazing", "shocking"})
+# A whole whitespace-delimited word that is a marker once case and surrounding commas are ignored.
+_BIASED_WORD_RE = re.compile(
+    r"(?<!\S),*(?:" + "|".join(sorted(map(re.escape, BIASED_MARKERS))) + r"),*(?!\S)", re.IGNORECASE
+)
 
 
 def detect_market_movement(cluster: ClusterPayload) -> bool:
@@ -82,12 +132,18 @@ def detect_market_movement(cluster: ClusterPayload) -> bool:
     )
 
 
+def _iter_sentences(text: str) -> Iterator[str]:
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group().strip()
+        if sentence:
+            yield sentence
+
+
 def derive_visual_texture(cluster: ClusterPayload) -> Dict[str, List[str]]:
     aggregated_tags = sorted({tag.strip() for tag in cluster.visual_tags if tag.strip()})
     cues: List[str] = []
     if cluster.transcript_summary:
-        sentences = [s.strip() for s in cluster.transcript_summary.split(".") if s.strip()]
-        cues = sentences[:3]
+        cues = list(itertools.islice(_iter_sentences(cluster.transcript_summary), 3))
     engagement_notes = []
     if cluster.engagement_rate is not None:
         engagement_notes.append(f"Engagement rate: {cluster.engagement_rate:.2f}")
@@ -103,13 +159,9 @@ def derive_visual_texture(cluster: ClusterPayload) -> Dict[str, List[str]]:
 def neutralize_fact_card(fact_card: Optional[str]) -> Optional[str]:
     if not fact_card:
         return None
-    sentences = [s.strip() for s in fact_card.split(".") if s.strip()]
     neutralized: List[str] = []
-    biased_markers = {"should", "must", "terrible", "amazing", "shocking"}
-    for sentence in sentences:
-        words = sentence.split()
-        filtered_words = [word for word in words if word.lower().strip(",") not in biased_markers]
-        cleaned = " ".join(filtered_words)
+    for sentence in _iter_sentences(fact_card):
+        cleaned = " ".join(_BIASED_WORD_RE.sub("", sentence).split())
         if cleaned:
             neutralized.append(cleaned)
     if not neutralized:
@@ -118,10 +170,8 @@ def neutralize_fact_card(fact_card: Optional[str]) -> Optional[str]:
 
 
 def evaluate_validation(cluster: ClusterPayload) -> Dict[str, Any]:
-    missing_clips = len(cluster.representative_clips) == 0
-    garbled_transcripts = any(
-        clip.is_garbled or clip.transcript_is_missing() for clip in cluster.representative_clips
-    )
+    missing_clips = not cluster.representative_clips
+    garbled_transcripts = any(clip.is_unusable for clip in cluster.representative_clips)
     prompts = []
     if missing_clips:
         prompts.append("No representative clips provided. Add at least one clip or skip this cluster.")
@@ -136,19 +186,88 @@ def evaluate_validation(cluster: ClusterPayload) -> Dict[str, Any]:
     }
 
 
+def _encode_cluster_head(state: Dict[str, Any]) -> bytes:
+    return orjson.dumps({
+        "cluster_count": len(state.get("clusters", [])),
+        "history_count": len(state.get("history", [])),
+    })
+
+
+def _encode_jsonl(entries: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+
+
+def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    entries: List[Dict[str, Any]] = []
+    with path.open("rb") as handle:
+        for line in handle:
+            try:
+                entries.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                continue
+    return entries
+
+
 def load_cluster_state() -> Dict[str, Any]:
-    if not CLUSTER_STATE_FILE.exists():
-        return {"clusters": [], "history": []}
-    with CLUSTER_STATE_FILE.open("r", encoding="utf-8") as handle:
+    head: Dict[str, Any] = {}
+    if CLUSTER_STATE_FILE.exists():
         try:
-            return json.load(handle)
-        except json.JSONDecodeError:
-            return {"clusters": [], "history": []}
+            head = orjson.loads(CLUSTER_STATE_FILE.read_bytes())
+        except orjson.JSONDecodeError:
+            head = {}
+    # Older heads embedded the full lists. Replacing (not appending to) the JSONL
+    # files keeps the migration safe to repeat if it is interrupted.
+    legacy = {
+        CLUSTER_RECORDS_FILE: head.get("clusters"),
+        CLUSTER_HISTORY_FILE: head.get("history"),
+    }
+    for path, entries in legacy.items():
+        if isinstance(entries, list):
+            write_atomic(path, _encode_jsonl(entries))
+    state = {
+        "clusters": _read_jsonl(CLUSTER_RECORDS_FILE),
+        "history": _read_jsonl(CLUSTER_HISTORY_FILE),
+    }
+    if any(isinstance(entries, list) for entries in legacy.values()):
+        write_atomic(CLUSTER_STATE_FILE, _encode_cluster_head(state))
+    return state
+
+
+@dataclass
+class ClusterStateManager:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    state: Dict[str, Any] = field(default_factory=load_cluster_state)
+    write_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    clusters_by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for cluster in self.state.get("clusters", []):
+            self.clusters_by_id.setdefault(cluster.get("cluster_id"), cluster)
+
+    def get_state_readonly(self) -> Dict[str, Any]:
+        """Return the live state; add_clusters only appends to its lists, so callers must not mutate it."""
+        with self.lock:
+            return self.state
 
+    def get_cluster(self, cluster_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.clusters_by_id.get(cluster_id)
 
-def persist_cluster_state(state: Dict[str, Any]) -> None:
-    with CLUSTER_STATE_FILE.open("w", encoding="utf-8") as handle:
-        json.dump(state, handle, indent=2, ensure_ascii=False)
+    async def add_clusters(self, records: List[Dict[str, Any]], history: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            for record in records:
+                self.clusters_by_id.setdefault(record["cluster_id"], record)
+            self.state.setdefault("clusters", []).extend(records)
+            self.state.setdefault("history", []).extend(history)
+            head = _encode_cluster_head(self.state)
+        record_lines = _encode_jsonl(records)
+        history_lines = _encode_jsonl(history)
+        async with self.write_lock:
+            await asyncio.to_thread(_append_bytes, CLUSTER_RECORDS_FILE, record_lines)
+            await asyncio.to_thread(_append_bytes, CLUSTER_HISTORY_FILE, history_lines)
+            await asyncio.to_thread(write_atomic, CLUSTER_STATE_FILE, head)
 
 
 class ClusterIngestionRequest(BaseModel):
@@ -160,6 +279,8 @@ class ClusterIngestionRequest(BaseModel):
 # ----------------------------
 
 WORKSPACE_STATE_PATH = Path("workspace_state.json")
+CLIPS_DIR = Path("app/static/clips")
+_clips_cache: Dict[str, Any] = {"mtime": None, "names": []}
 
 
 def utc_now() -> str:
@@ -170,24 +291,52 @@ def approx_tokens(text: str) -> int:
     return max(1, len(text) // 4)
 
 
+def _append_bytes(path: Path, payload: bytes) -> None:
+    with path.open("ab") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _list_clips() -> List[str]:
+    try:
+        mtime = os.stat(CLIPS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime != _clips_cache["mtime"]:
+        with os.scandir(CLIPS_DIR) as entries:
+            names = [entry.name for entry in entries if entry.is_file()]
+        _clips_cache.update(mtime=mtime, names=names)
+    return _clips_cache["names"]
+
+
 @dataclass
 class WorkspaceStateManager:
     state_path: Path
+    flush_interval: float = 0.2
     lock: threading.Lock = field(default_factory=threading.Lock)
     state: Dict[str, Any] = field(default_factory=dict)
+    dirty: threading.Event = field(default_factory=threading.Event)
+    write_lock: threading.Lock = field(default_factory=threading.Lock)
+    variant_positions: Dict[str, int] = field(default_factory=dict)
 
     def __post_init__(self) -> None:
         self._ensure_state()
+        for position, variant in enumerate(self.state.get("variants", [])):
+            self.variant_positions.setdefault(variant["id"], position)
+        self.writer = threading.Thread(target=self._flush_loop, daemon=True)
+        self.writer.start()
+        atexit.register(self.flush)
 
     def _ensure_state(self) -> None:
         if self.state_path.exists():
             try:
-                self.state = json.loads(self.state_path.read_text())
+                self.state = orjson.loads(self.state_path.read_bytes())
                 return
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
 
-        clips = [p.name for p in Path("app/static/clips").glob("*") if p.is_file()]
+        clips = _list_clips()
         self.state = {
             "version": 1,
             "updated_at": utc_now(),
@@ -202,83 +351,161 @@ class WorkspaceStateManager:
         self._write_state()
 
     def _write_state(self) -> None:
-        self.state_path.write_text(json.dumps(self.state, indent=2))
+        write_atomic(self.state_path, orjson.dumps(self.state))
 
-    def get_state(self) -> Dict[str, Any]:
+    def _schedule_write(self) -> None:
+        self.dirty.set()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self.dirty.wait()
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write %s; retrying", self.state_path)
+
+    def flush(self) -> None:
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty.is_set():
+                    return
+                self.dirty.clear()
+                payload = orjson.dumps(self.state)
+            try:
+                write_atomic(self.state_path, payload)
+            except Exception:
+                self.dirty.set()
+                raise
+
+    def get_state_readonly(self) -> Dict[str, Any]:
+        """Return the live state; history lists only grow, other containers are swapped. Do not mutate."""
+        with self.lock:
+            return self.state
+
+    def get_variant(self, variant_id: str) -> Optional[Dict[str, Any]]:
         with self.lock:
-            return copy.deepcopy(self.state)
+            position = self.variant_positions.get(variant_id)
+            return None if position is None else self.state["variants"][position]
 
     def _bump_version(self, note: str) -> None:
         self.state.setdefault("history", []).append(
             {"version": self.state.get("version", 1), "updated_at": self.state.get("updated_at"), "note": note}
         )
-        self.state["version"] = self.state.get("version", 1) + 1
-        self.state["updated_at"] = utc_now()
+        self.state = {
+            **self.state,
+            "version": self.state.get("version", 1) + 1,
+            "updated_at": utc_now(),
+        }
 
     def update_document(self, title: str, summary: str, content: str, overrides: Dict[str, bool]) -> None:
         with self.lock:
-            self.state["document"].update({"title": title, "summary": summary, "content": content})
-            self.state["overrides"] = overrides
+            document = {**self.state["document"], "title": title, "summary": summary, "content": content}
+            self.state = {**self.state, "document": document, "overrides": overrides}
             self._bump_version("document updated")
-            self._write_state()
+            self._schedule_write()
 
     def update_scratchpad(self, scratchpad: str) -> None:
         with self.lock:
-            self.state["scratchpad"] = scratchpad
+            self.state = {**self.state, "scratchpad": scratchpad}
             self._bump_version("scratchpad updated")
-            self._write_state()
+            self._schedule_write()
 
     def append_variant(self, variant: Dict[str, Any]) -> None:
+        self.append_variants([variant])
+
+    def append_variants(self, new_variants: List[Dict[str, Any]]) -> None:
+        if not new_variants:
+            return
         with self.lock:
-            self.state.setdefault("variants", []).append(variant)
-            self._bump_version("variant generated")
-            self._write_state()
+            variants = [*self.state.get("variants", []), *new_variants]
+            first_position = len(variants) - len(new_variants)
+            for position, variant in enumerate(new_variants, start=first_position):
+                self.variant_positions.setdefault(variant["id"], position)
+            self.state = {**self.state, "variants": variants}
+            note = "variant generated" if len(new_variants) == 1 else f"{len(new_variants)} variants generated"
+            self._bump_version(note)
+            self._schedule_write()
 
     def add_polish(self, variant_id: str, text: str) -> None:
         with self.lock:
-            for variant in self.state.get("variants", []):
-                if variant["id"] == variant_id:
-                    variant.setdefault("polished", []).append(text)
-                    break
+            variants = list(self.state.get("variants", []))
+            position = self.variant_positions.get(variant_id)
+            if position is not None:
+                variant = variants[position]
+                variants[position] = {**variant, "polished": [*variant.get("polished", []), text]}
             self.state.setdefault("polish_history", []).append(
                 {"variant_id": variant_id, "text": text, "polished_at": utc_now()}
             )
+            self.state = {**self.state, "variants": variants}
             self._bump_version("polish drafted")
-            self._write_state()
+            self._schedule_write()
 
 
 class JobQueue:
     def __init__(self, on_complete) -> None:
-        self.queue: Queue = Queue()
+        self.queue: asyncio.Queue = asyncio.Queue()
         self.jobs: Dict[str, Dict[str, Any]] = {}
         self.on_complete = on_complete
-        self.worker = threading.Thread(target=self._worker, daemon=True)
-        self.worker.start()
-
-    def _worker(self) -> None:
+        self.id_prefix = secrets.token_hex(4)
+        self.id_counter = itertools.count(1)
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.worker is None:
+            self.queue = rehome_queue(self.queue)
+            self.worker = asyncio.get_running_loop().create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.worker
+        self.worker = None
+
+    async def _worker(self) -> None:
         while True:
-            job = self.queue.get()
-            if not job:
-                continue
-            job_id = job["id"]
-            job["status"] = "running"
-            self.jobs[job_id] = job
-            payload = job.get("payload", {})
-
-            if job["type"] == "draft":
-                draft_text = self._draft_text(payload)
-                job["result"] = draft_text
-                job["status"] = "completed"
-                self.on_complete("draft", job)
-            elif job["type"] == "polish":
-                polish_text = self._polish_text(payload)
-                job["result"] = polish_text
-                job["status"] = "completed"
-                self.on_complete("polish", job)
-            else:
-                job["status"] = "unknown"
-
-            self.queue.task_done()
+            batch = [await self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                for job in batch:
+                    try:
+                        self._run_job(job)
+                    except Exception:
+                        job["status"] = "failed"
+                        logger.exception("Job %s failed", job["id"])
+                completed = [job for job in batch if job["status"] == "completed"]
+                try:
+                    self.on_complete(completed)
+                except Exception:
+                    for job in completed:
+                        job["status"] = "failed"
+                    logger.exception("Completion handling failed for %d jobs", len(completed))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        job["status"] = "running"
+        payload = job.get("payload", {})
+
+        if job["type"] == "draft":
+            job["result"] = self._draft_text(payload)
+        elif job["type"] == "draft_batch":
+            job["result"] = [
+                self._draft_text({**payload, "index": idx}) for idx in range(1, payload.get("count", 1) + 1)
+            ]
+        elif job["type"] == "polish":
+            job["result"] = self._polish_text(payload)
+        else:
+            job["status"] = "unknown"
+            return
+        job["status"] = "completed"
 
     def _draft_text(self, payload: Dict[str, Any]) -> str:
         base = payload.get("base", "Draft")
@@ -292,7 +519,7 @@ class JobQueue:
         return f"Polished with notes: {notes}\n{text}"
 
     def enqueue(self, job_type: str, payload: Dict[str, Any]) -> str:
-        job_id = str(uuid.uuid4())
+        job_id = f"{self.id_prefix}-{next(self.id_counter)}"
         job = {
             "id": job_id,
             "type": job_type,
@@ -301,35 +528,63 @@ class JobQueue:
             "created_at": utc_now(),
         }
         self.jobs[job_id] = job
-        self.queue.put(job)
+        self.queue.put_nowait(job)
         return job_id
 
     def list_jobs(self) -> List[Dict[str, Any]]:
         return sorted(self.jobs.values(), key=lambda j: j.get("created_at", ""), reverse=True)
 
 
-def handle_completion(kind: str, job: Dict[str, Any]) -> None:
-    payload = job.get("payload", {})
-    if kind == "draft":
-        variant = {
-            "id": job["id"],
-            "text": job.get("result", ""),
-            "created_at": job.get("created_at"),
-            "prompt": payload.get("base", ""),
-            "polished": [],
-        }
-        manager.append_variant(variant)
-    elif kind == "polish":
-        variant_id = payload.get("variant_id")
-        manager.add_polish(variant_id=variant_id, text=job.get("result", ""))
+def _variant_record(variant_id: str, text: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": variant_id,
+        "text": text,
+        "created_at": job.get("created_at"),
+        "prompt": job.get("payload", {}).get("base", ""),
+        "polished": [],
+    }
+
+
+def handle_completion(jobs: List[Dict[str, Any]]) -> None:
+    variants: List[Dict[str, Any]] = []
+    for job in jobs:
+        if job["type"] == "draft":
+            variants.append(_variant_record(job["id"], job.get("result", ""), job))
+        elif job["type"] == "draft_batch":
+            variants.extend(
+                _variant_record(f"{job['id']}-{idx}", text, job)
+                for idx, text in enumerate(job.get("result", []), start=1)
+            )
+    manager.append_variants(variants)
+
+    for job in jobs:
+        if job["type"] == "polish":
+            variant_id = job.get("payload", {}).get("variant_id")
+            manager.add_polish(variant_id=variant_id, text=job.get("result", ""))
 
 
 manager = WorkspaceStateManager(WORKSPACE_STATE_PATH)
+cluster_manager = ClusterStateManager()
 queue = JobQueue(on_complete=handle_completion)
 
-app = FastAPI(title="Workflow Drafting")
-templates = Jinja2Templates(directory="app/templates")
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app = FastAPI(title="Workflow Drafting", default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+app.mount("/static", StaticFiles(directory="app/static", check_dir=False), name="static")
+
+
+@lru_cache(maxsize=1)
+def _templates() -> Jinja2Templates:
+    return Jinja2Templates(directory="app/templates")
+
+
+@app.on_event("startup")
+async def start_job_queue() -> None:
+    queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue() -> None:
+    await queue.stop()
 
 
 # ----------------------------
@@ -339,13 +594,13 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 @app.get("/clusters", response_class=HTMLResponse)
 async def cluster_dashboard(request: Request):
-    state = load_cluster_state()
-    return templates.TemplateResponse("dashboard.html", {"request": request, "state": state})
+    state = cluster_manager.get_state_readonly()
+    return _templates().TemplateResponse("dashboard.html", {"request": request, "state": state})
 
 
 @app.get("/clusters/state")
 async def get_cluster_state():
-    return load_cluster_state()
+    return cluster_manager.get_state_readonly()
 
 
 @app.post("/clusters/ingest")
@@ -353,15 +608,15 @@ async def ingest_clusters(payload: ClusterIngestionRequest):
     if not payload.clusters:
         raise HTTPException(status_code=400, detail="No clusters provided")
 
-    state = load_cluster_state()
-    now = datetime.utcnow().isoformat() + "Z"
+    now = utc_now()
     ingested_clusters = []
+    history = []
 
     for cluster in payload.clusters:
         validation = evaluate_validation(cluster)
-        market_movement = detect_market_movement(cluster)
-        visual_texture = derive_visual_texture(cluster)
-        neutral_fact_card = neutralize_fact_card(cluster.fact_card)
+        market_movement = cluster.market_movement
+        visual_texture = cluster.visual_texture
+        neutral_fact_card = cluster.neutral_fact_card
 
         cluster_record = {
             "cluster_id": cluster.cluster_id,
@@ -380,8 +635,7 @@ async def ingest_clusters(payload: ClusterIngestionRequest):
             "ingested_at": now,
         }
         ingested_clusters.append(cluster_record)
-        state.setdefault("clusters", []).append(cluster_record)
-        state.setdefault("history", []).append(
+        history.append(
             {
                 "cluster_id": cluster.cluster_id,
                 "ingested_at": now,
@@ -392,17 +646,16 @@ async def ingest_clusters(payload: ClusterIngestionRequest):
             }
         )
 
-    persist_cluster_state(state)
+    await cluster_manager.add_clusters(ingested_clusters, history)
     return {"ingested": ingested_clusters, "count": len(ingested_clusters)}
 
 
 @app.get("/clusters/{cluster_id}")
 async def get_cluster(cluster_id: str):
-    state = load_cluster_state()
-    for cluster in state.get("clusters", []):
-        if cluster.get("cluster_id") == cluster_id:
-            return cluster
-    raise HTTPException(status_code=404, detail="Cluster not found")
+    cluster = cluster_manager.get_cluster(cluster_id)
+    if cluster is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return cluster
 
 
 # ----------------------------
@@ -412,22 +665,28 @@ async def get_cluster(cluster_id: str):
 
 def compute_token_cost(state: Dict[str, Any]) -> int:
     doc = state.get("document", {})
-    total_text = " ".join([doc.get("title", ""), doc.get("summary", ""), doc.get("content", "")])
-    total_text += " " + state.get("scratchpad", "")
+    # Length of all fragments joined with single spaces, without building the string.
+    total_chars = (
+        len(doc.get("title", ""))
+        + len(doc.get("summary", ""))
+        + len(doc.get("content", ""))
+        + len(state.get("scratchpad", ""))
+        + 3
+    )
     for variant in state.get("variants", []):
-        total_text += " " + variant.get("text", "")
-        for pol in variant.get("polished", []) if variant.get("polished") else []:
-            total_text += " " + pol
-    return approx_tokens(total_text)
+        total_chars += len(variant.get("text", "")) + 1
+        for polished in variant.get("polished") or ():
+            total_chars += len(polished) + 1
+    return max(1, total_chars // 4)
 
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    state = manager.get_state()
+    state = manager.get_state_readonly()
     token_cost = compute_token_cost(state)
     jobs = queue.list_jobs()
-    clips = [p.name for p in Path("app/static/clips").glob("*") if p.is_file()]
-    return templates.TemplateResponse(
+    clips = _list_clips()
+    return _templates().TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -469,26 +728,31 @@ async def start_draft(
     context: str = Form(""),
     variant_count: int = Form(1),
 ):
-    for idx in range(1, max(1, variant_count) + 1):
-        queue.enqueue(
-            "draft",
-            {
-                "base": base_prompt,
-                "context": context,
-                "index": idx,
-            },
-        )
+    queue.enqueue(
+        "draft_batch",
+        {
+            "base": base_prompt,
+            "context": context,
+            "count": max(1, variant_count),
+        },
+    )
     return RedirectResponse("/", status_code=303)
 
 
 @app.post("/start-polish")
 async def start_polish(variant_id: str = Form(...), notes: str = Form("")):
-    state = manager.get_state()
-    variant_text = next((v["text"] for v in state.get("variants", []) if v["id"] == variant_id), "")
+    variant = manager.get_variant(variant_id)
+    variant_text = variant["text"] if variant else ""
     queue.enqueue("polish", {"variant_id": variant_id, "text": variant_text, "notes": notes})
     return RedirectResponse("/", status_code=303)
 
 
 @app.get("/state")
 async def get_state():
-    return manager.get_state()
+    return manager.get_state_readonly()
+
+
+@app.get("/export")
+async def export_state():
+    payload = orjson.dumps(manager.get_state_readonly(), option=orjson.OPT_INDENT_2)
+    return Response(content=payload, media_type="application/json")
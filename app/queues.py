@@ -0,0 +1,16 @@
+"""Asyncio queue helpers shared by the FastAPI apps."""
+from __future__ import annotations
+
+import asyncio
+
+
+def rehome_queue(queue: asyncio.Queue) -> asyncio.Queue:
+    """Move pending items onto a fresh queue.
+
+    A queue binds to the first event loop that waits on it, so each app lifespan
+    starts its worker on a new queue.
+    """
+    fresh: asyncio.Queue = asyncio.Queue()
+    while not queue.empty():
+        fresh.put_nowait(queue.get_nowait())
+    return fresh
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-import json
+import atexit
+import sys
+import threading
 import time
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+import orjson
 
 from app.archetypes import Archetype, BeatSlot
+from app.storage import write_atomic
 
 FIFTEEN_MINUTES = 15 * 60
 STATE_PATH = Path("workspace_state.json")
@@ -28,10 +33,14 @@ class BeatState:
     text: str = ""
     clip: Optional[ClipSelection] = None
     operator_approved: bool = False
+    _spoken_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _spoken_runtime: float = field(default=0.0, init=False, repr=False, compare=False)
 
     def spoken_runtime(self) -> float:
-        words = len(self.text.split())
-        return words / 2.5
+        if self._spoken_text is not self.text:
+            self._spoken_runtime = len(self.text.split()) / 2.5
+            self._spoken_text = self.text
+        return self._spoken_runtime
 
     def clip_runtime(self) -> float:
         return self.clip.duration() if self.clip else 0.0
@@ -69,16 +78,21 @@ class ScriptState:
         setup = self.beats.get("Setup")
         clip = self.beats.get("Clip")
         if setup and clip:
-            if not setup.text:
+            setup_text = setup.text
+            clip_text = clip.text
+            if not setup_text:
                 notes.append("Setup text is empty; establish context before rolling clip.")
-            if not clip.text and not clip.clip:
+            if not clip_text and not clip.clip:
                 notes.append("Clip beat has no footage or narration; confirm source.")
-            if clip.clip and clip.clip.clip_id.lower() not in setup.text.lower():
+            if clip.clip and clip.clip.clip_id.lower() not in setup_text.lower():
                 notes.append(
                     "Setup should reference the upcoming clip (id or subject) to prime the transition."
                 )
-            if setup.text and clip.text and setup.text.split()[-1].lower() == clip.text.split()[0].lower():
-                notes.append("Setup and Clip share connective phrasing; transition should feel seamless.")
+            if setup_text and clip_text:
+                last_setup_word = setup_text.rsplit(None, 1)[-1]
+                first_clip_word = clip_text.split(None, 1)[0]
+                if last_setup_word.lower() == first_clip_word.lower():
+                    notes.append("Setup and Clip share connective phrasing; transition should feel seamless.")
             if clip.clip is None:
                 notes.append("Clip segment has no selected footage; choose a source clip and in/out.")
             if not clip.operator_approved:
@@ -89,20 +103,20 @@ class ScriptState:
         per_beat: Dict[str, float] = {}
         cumulative = 0.0
         for slot in self.archetype.slots:
-            beat = self.beats[slot.name]
-            cumulative += beat.total_runtime()
-            per_beat[slot.name] = beat.total_runtime()
+            runtime = self.beats[slot.name].total_runtime()
+            per_beat[slot.name] = runtime
+            cumulative += runtime
         return cumulative, per_beat
 
     def over_budget_beats(self) -> List[str]:
         cumulative = 0.0
-        flagged: List[str] = []
-        for slot in self.archetype.slots:
-            beat = self.beats[slot.name]
-            cumulative += beat.total_runtime()
+        slots = self.archetype.slots
+        for index, slot in enumerate(slots):
+            cumulative += self.beats[slot.name].total_runtime()
             if cumulative > FIFTEEN_MINUTES:
-                flagged.append(slot.name)
-        return flagged
+                # Runtimes are never negative, so every later beat stays over budget.
+                return [later.name for later in slots[index:]]
+        return []
 
     def _require_slot(self, slot_name: str) -> None:
         if slot_name not in self.beats:
@@ -110,58 +124,178 @@ class ScriptState:
 
 
 # Workspace state helpers for toolkit selection flows
-
-def load_state(path: Path = STATE_PATH) -> Dict:
+#
+# Mutations go to an in-memory copy of the toolkit-owned keys of each state file;
+# flush_state() merges them into the file as it is on disk, leaving keys written by
+# the other apps alone (the toolkit app calls it on a short timer and at shutdown,
+# and it also runs at interpreter exit). Failed writes stay queued for the next flush.
+# selection_log / angle_log events are appended to NDJSON files beside the state
+# file so the state itself stays small.
+
+TOOLKIT_KEYS = ("toolkit_selection", "angles")
+LOG_KEYS = ("selection_log", "angle_log")
+INTERNED_KEYS = frozenset({"id", "name", "category", "status", "tags"})
+
+_STATE_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
+_STATE_CACHE: Dict[Path, Dict] = {}
+_DIRTY: Set[Path] = set()
+_PENDING_LOGS: Dict[Path, List[bytes]] = {}
+_ANGLE_INDEX: Dict[Path, Dict[str, Dict]] = {}
+
+
+def _intern_state(value, intern_strings: bool = False):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = _intern_state(item, key in INTERNED_KEYS)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            value[index] = _intern_state(item, intern_strings)
+    elif intern_strings and isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _read_state(path: Path) -> Dict:
     if not path.exists():
-        return {"toolkit_selection": [], "angles": []}
+        return {}
     try:
-        return json.loads(path.read_text())
-    except json.JSONDecodeError:
-        return {"toolkit_selection": [], "angles": []}
+        state = orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError:
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _toolkit_view(state: Dict) -> Dict:
+    return {key: state.get(key) or [] for key in TOOLKIT_KEYS}
+
+
+def _log_path(path: Path, key: str) -> Path:
+    return path.with_name(f"{key}.ndjson")
+
+
+def _queue_log(path: Path, key: str, record: Dict) -> None:
+    _PENDING_LOGS.setdefault(_log_path(path, key), []).append(orjson.dumps(record) + b"\n")
+
+
+def _index_angles(path: Path, state: Dict) -> None:
+    index: Dict[str, Dict] = {}
+    for angle in state.get("angles", []):
+        index.setdefault(angle.get("id"), angle)
+    _ANGLE_INDEX[path] = index
+
+
+def _cached_state(path: Path) -> Dict:
+    state = _STATE_CACHE.get(path)
+    if state is None:
+        on_disk = _read_state(path)
+        state = _STATE_CACHE[path] = _intern_state(_toolkit_view(on_disk))
+        for key in LOG_KEYS:
+            if key in on_disk:
+                for record in on_disk[key] or []:
+                    _queue_log(path, key, record)
+                _DIRTY.add(path)
+        _index_angles(path, state)
+    return state
+
+
+def load_state(path: Path = STATE_PATH) -> Dict:
+    with _STATE_LOCK:
+        return dict(_cached_state(path))
 
 
 def persist_state(state: Dict, path: Path = STATE_PATH) -> None:
-    path.write_text(json.dumps(state, indent=2))
+    """Replace the cached toolkit keys; flush_state() writes them (on the app's timer and at exit)."""
+    with _STATE_LOCK:
+        state = _STATE_CACHE[path] = _toolkit_view(state)
+        _index_angles(path, state)
+        _DIRTY.add(path)
+
+
+def dump_state_pretty(path: Path = STATE_PATH) -> str:
+    with _STATE_LOCK:
+        return orjson.dumps(_cached_state(path), option=orjson.OPT_INDENT_2).decode()
+
+
+def flush_state() -> None:
+    with _WRITE_LOCK:
+        with _STATE_LOCK:
+            dirty = list(_DIRTY)
+            _DIRTY.clear()
+            logs = list(_PENDING_LOGS.items())
+            _PENDING_LOGS.clear()
+        for position, (path, lines) in enumerate(logs):
+            try:
+                with path.open("ab") as handle:
+                    handle.write(b"".join(lines))
+            except Exception:
+                _requeue(logs[position:], dirty)
+                raise
+        for position, path in enumerate(dirty):
+            try:
+                merged = _read_state(path)
+                for key in LOG_KEYS:
+                    merged.pop(key, None)
+                with _STATE_LOCK:
+                    merged.update(_STATE_CACHE[path])
+                    payload = orjson.dumps(merged)
+                write_atomic(path, payload)
+            except Exception:
+                _requeue([], dirty[position:])
+                raise
+
+
+def _requeue(logs: List[Tuple[Path, List[bytes]]], dirty_paths: List[Path]) -> None:
+    with _STATE_LOCK:
+        for path, lines in logs:
+            _PENDING_LOGS.setdefault(path, [])[:0] = lines
+        _DIRTY.update(dirty_paths)
+
+
+atexit.register(flush_state)
 
 
 def record_selection(tools: List[Dict], path: Path = STATE_PATH) -> Dict:
-    state = load_state(path)
-    state["toolkit_selection"] = [tool for tool in tools]
-    state.setdefault("selection_log", []).append({
-        "timestamp": time.time(),
-        "tools": tools,
-    })
-    persist_state(state, path)
-    return state
+    with _STATE_LOCK:
+        state = _cached_state(path)
+        state["toolkit_selection"] = [tool for tool in tools]
+        _queue_log(path, "selection_log", {
+            "timestamp": time.time(),
+            "tools": tools,
+        })
+        _DIRTY.add(path)
+        return dict(state)
 
 
 def record_angles(angles: List[Dict], path: Path = STATE_PATH) -> Dict:
-    state = load_state(path)
-    state["angles"] = angles
-    state.setdefault("angle_log", []).append({
-        "timestamp": time.time(),
-        "angles": angles,
-    })
-    persist_state(state, path)
-    return state
+    with _STATE_LOCK:
+        state = _cached_state(path)
+        state["angles"] = angles
+        _index_angles(path, state)
+        _queue_log(path, "angle_log", {
+            "timestamp": time.time(),
+            "angles": angles,
+        })
+        _DIRTY.add(path)
+        return dict(state)
 
 
 def choose_angle(angle_id: str, path: Path = STATE_PATH) -> Dict:
-    state = load_state(path)
-    for angle in state.get("angles", []):
-        if angle.get("id") == angle_id:
+    with _STATE_LOCK:
+        state = _cached_state(path)
+        angle = _ANGLE_INDEX[path].get(angle_id)
+        if angle is not None:
             angle["status"] = "selected"
-            break
-    persist_state(state, path)
-    return state
+        _DIRTY.add(path)
+        return dict(state)
 
 
 def override_angle(angle_id: str, new_text: str, path: Path = STATE_PATH) -> Dict:
-    state = load_state(path)
-    for angle in state.get("angles", []):
-        if angle.get("id") == angle_id:
+    with _STATE_LOCK:
+        state = _cached_state(path)
+        angle = _ANGLE_INDEX[path].get(angle_id)
+        if angle is not None:
             angle["angle"] = new_text
             angle["status"] = "overridden"
-            break
-    persist_state(state, path)
-    return state
+        _DIRTY.add(path)
+        return dict(state)
@@ -0,0 +1,15 @@
+"""Small file-writing helpers shared by the prototypes."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def write_atomic(path: Path, payload: bytes) -> None:
+    """Write payload to a sibling temp file, fsync it, then swap it into place."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
@@ -1,11 +1,17 @@
 """Toolkit loader and selection utilities."""
 from __future__ import annotations
 
-import json
+import functools
+import heapq
 import random
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from app.storage import write_atomic
 
 CATEGORY_NAMES: List[str] = [
     "Storyboarding",
@@ -32,6 +38,10 @@ CATEGORY_NAMES: List[str] = [
     "Lighting",
 ]
 
+CATEGORY_SLUGS: Tuple[str, ...] = tuple(category.lower().replace(" ", "-") for category in CATEGORY_NAMES)
+
+_RNG = random.Random()
+
 
 @dataclass(frozen=True)
 class Tool:
@@ -40,6 +50,23 @@ class Tool:
     core_principle: str
     tags: List[str]
     examples: List[str]
+    tag_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    visual_bonus: float = field(init=False, repr=False, compare=False)
+    _payload: Dict[str, object] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "tag_set", frozenset(self.tags))
+        object.__setattr__(self, "visual_bonus", 0.5 if "visual" in self.tag_set else 0)
+        object.__setattr__(self, "_payload", {
+            "name": self.name,
+            "category": self.category,
+            "core_principle": self.core_principle,
+            "tags": self.tags,
+            "examples": self.examples,
+        })
+
+    def as_dict(self) -> Dict[str, object]:
+        return self._payload
 
 
 @dataclass
@@ -48,13 +75,23 @@ class Toolkit:
     categories: List[str]
     by_category: Dict[str, List[Tool]]
     by_tag: Dict[str, List[Tool]]
+    by_name: Dict[str, Tool]
+    tag_bits: Dict[str, int]
+    tag_masks: List[int]
+    visual_bonuses: List[float]
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     def as_dict(self) -> Dict[str, object]:
         return {
             "categories": self.categories,
-            "tools": [tool.__dict__ for tool in self.tools],
+            "tools": [tool.as_dict() for tool in self.tools],
         }
 
+    def as_json(self) -> bytes:
+        if self._json is None:
+            self._json = orjson.dumps(self.as_dict())
+        return self._json
+
 
 _DEF_EXAMPLES = [
     "Translate the concept into a storyboard panel that exaggerates the visual gag.",
@@ -71,10 +108,11 @@ _DEF_CORE = [
 
 
 def _build_tool(index: int) -> Tool:
-    category = CATEGORY_NAMES[index % len(CATEGORY_NAMES)]
+    category_index = index % len(CATEGORY_NAMES)
+    category = CATEGORY_NAMES[category_index]
     variant = (index % 15) + 1
     core_principle = f"{category} discipline #{(index % 7) + 1}: {_DEF_CORE[index % len(_DEF_CORE)]}"
-    tags = [category.lower().replace(" ", "-"), "phase1", "visual", f"variant-{(index % 5) + 1}"]
+    tags = [CATEGORY_SLUGS[category_index], "phase1", "visual", f"variant-{(index % 5) + 1}"]
     examples = [f"{category} example {variant:03d}: {_DEF_EXAMPLES[index % len(_DEF_EXAMPLES)]}"]
     return Tool(
         name=f"{category} Tool {variant:03d}",
@@ -85,26 +123,47 @@ def _build_tool(index: int) -> Tool:
     )
 
 
+@functools.lru_cache(maxsize=1)
 def load_toolkit() -> Toolkit:
     tools: List[Tool] = [_build_tool(i) for i in range(329)]
     by_category: Dict[str, List[Tool]] = {category: [] for category in CATEGORY_NAMES}
-    by_tag: Dict[str, List[Tool]] = {}
+    by_tag: Dict[str, List[Tool]] = defaultdict(list)
+    by_name: Dict[str, Tool] = {}
 
     for tool in tools:
+        by_name[tool.name] = tool
         by_category[tool.category].append(tool)
         for tag in tool.tags:
-            by_tag.setdefault(tag, []).append(tool)
+            by_tag[tag].append(tool)
+
+    tag_bits = {tag: 1 << bit for bit, tag in enumerate(by_tag)}
+
+    return Toolkit(
+        tools=tools,
+        categories=CATEGORY_NAMES,
+        by_category=by_category,
+        by_tag=dict(by_tag),
+        by_name=by_name,
+        tag_bits=tag_bits,
+        tag_masks=[_tag_mask(tool.tag_set, tag_bits) for tool in tools],
+        visual_bonuses=[tool.visual_bonus for tool in tools],
+    )
+
 
-    return Toolkit(tools=tools, categories=CATEGORY_NAMES, by_category=by_category, by_tag=by_tag)
+def _tag_mask(tags: Iterable[str], tag_bits: Dict[str, int]) -> int:
+    mask = 0
+    for tag in tags:
+        mask |= tag_bits.get(tag, 0)
+    return mask
 
 
-def _score_tool(tool: Tool, requested_tags: Iterable[str], texture_tags: Iterable[str]) -> float:
-    tag_set = set(tag.lower() for tag in requested_tags)
-    texture_set = set(tag.lower() for tag in texture_tags)
-    overlap = len(tag_set.intersection(tool.tags))
-    texture_overlap = len(texture_set.intersection(tool.tags))
-    visual_bonus = 0.5 if "visual" in tool.tags else 0
-    return overlap * 2 + texture_overlap + visual_bonus
+def _make_scorer(requested_mask: int, texture_mask: int) -> Callable[[int, float], float]:
+    def score(tag_mask: int, visual_bonus: float) -> float:
+        overlap = (requested_mask & tag_mask).bit_count()
+        texture_overlap = (texture_mask & tag_mask).bit_count()
+        return overlap * 2 + texture_overlap + visual_bonus
+
+    return score
 
 
 def select_tools(
@@ -115,22 +174,27 @@ def select_tools(
     limit: int = 8,
     fallback_mix: int = 5,
 ) -> List[Tool]:
-    requested_tags = list(tags or [])
-    texture_tags = (visual_texture or "").replace(",", " ").split()
+    requested_mask = _tag_mask((tag.lower() for tag in tags or []), toolkit.tag_bits)
+    texture_mask = _tag_mask(
+        (tag.lower() for tag in (visual_texture or "").replace(",", " ").split()), toolkit.tag_bits
+    )
 
+    tools = toolkit.tools
+    score = _make_scorer(requested_mask, texture_mask)
     scored = [
-        (tool, _score_tool(tool, requested_tags, texture_tags))
-        for tool in toolkit.tools
+        (index, score(tag_mask, visual_bonus))
+        for index, (tag_mask, visual_bonus) in enumerate(zip(toolkit.tag_masks, toolkit.visual_bonuses))
     ]
-    scored.sort(key=lambda pair: pair[1], reverse=True)
 
     if contrarian:
+        scored.sort(key=lambda pair: pair[1], reverse=True)
         midpoint = len(scored) // 2
         contrarian_pool = scored[midpoint: midpoint + (limit * 2)]
-        random.shuffle(contrarian_pool)
-        selected = [tool for tool, _ in contrarian_pool[:limit]]
+        picks = _RNG.sample(contrarian_pool, min(limit, len(contrarian_pool)))
+        selected = [tools[index] for index, _ in picks]
     else:
-        selected = [tool for tool, score in scored if score > 0][:limit]
+        positive = [pair for pair in scored if pair[1] > 0]
+        selected = [tools[index] for index, _ in heapq.nlargest(limit, positive, key=lambda pair: pair[1])]
 
     used_categories = {tool.category for tool in selected}
     if len(selected) < fallback_mix:
@@ -147,6 +211,6 @@ def select_tools(
 
 def save_selection(selection: List[Tool], path: Path) -> None:
     payload = {
-        "toolkit_selection": [tool.__dict__ for tool in selection],
+        "toolkit_selection": [tool.as_dict() for tool in selection],
     }
-    path.write_text(json.dumps(payload, indent=2))
+    write_atomic(path, orjson.dumps(payload))
@@ -1,57 +1,148 @@
 """Minimal FastAPI app to expose toolkit and comedic angle orchestration."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse, Response
 
-from app.toolkit import load_toolkit, select_tools
+from app.toolkit import Tool, load_toolkit, select_tools
 from app.angles import generate_comedic_angles
 from app import state as workspace_state
+from app.queues import rehome_queue
 
 app = FastAPI(title="Toolkit Loader")
+logger = logging.getLogger(__name__)
+
+STATE_FLUSH_INTERVAL = 0.2
+_flush_task: Optional[asyncio.Task] = None
+_angle_queue: asyncio.Queue = asyncio.Queue()
+_angle_worker_task: Optional[asyncio.Task] = None
+
+
+async def _flush_state_periodically() -> None:
+    while True:
+        await asyncio.sleep(STATE_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(workspace_state.flush_state)
+        except Exception:
+            logger.exception("Failed to flush workspace state; retrying")
+
+
+def _generate_angle_batch(jobs: List[Tuple[str, str, Sequence[Tool], bool]]) -> None:
+    for role, context, selection, contrarian in jobs:
+        try:
+            angles = generate_comedic_angles(role, context, selection, contrarian=contrarian)
+            workspace_state.record_angles([angle.as_dict() for angle in angles])
+        except Exception:
+            logger.exception("Angle generation failed for role %r", role)
+
+
+async def _angle_worker() -> None:
+    while True:
+        batch = [await _angle_queue.get()]
+        while True:
+            try:
+                batch.append(_angle_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            await asyncio.to_thread(_generate_angle_batch, batch)
+        finally:
+            for _ in batch:
+                _angle_queue.task_done()
+
+
+async def _cancel(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        logger.exception("Background task failed before shutdown")
+
+
+@app.on_event("startup")
+async def start_background_tasks() -> None:
+    global _flush_task, _angle_queue, _angle_worker_task
+    _angle_queue = rehome_queue(_angle_queue)
+    _angle_worker_task = asyncio.create_task(_angle_worker())
+    _flush_task = asyncio.create_task(_flush_state_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks() -> None:
+    await _cancel(_angle_worker_task)
+    await _cancel(_flush_task)
+    workspace_state.flush_state()
+
+
+@lru_cache(maxsize=256)
+def _ranked_selection(tags: Tuple[str, ...], visual_texture: Optional[str]) -> Tuple[Tool, ...]:
+    return tuple(select_tools(load_toolkit(), tags=tags, visual_texture=visual_texture))
+
+
+def _select(payload: dict) -> Sequence[Tool]:
+    tags = payload.get("tags", [])
+    visual_texture = payload.get("visual_texture")
+    if payload.get("contrarian", False):
+        return select_tools(load_toolkit(), tags=tags, visual_texture=visual_texture, contrarian=True)
+    return _ranked_selection(tuple(tags or ()), visual_texture)
+
+
+@lru_cache(maxsize=1)
+def _toolkit_etag() -> str:
+    return f'"{hashlib.md5(load_toolkit().as_json(), usedforsecurity=False).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _selection_from_ids(selection_ids: List[str]) -> List[Tool]:
+    by_name = load_toolkit().by_name
+    return [by_name[name] for name in selection_ids if name in by_name]
 
 
 @app.get("/toolkit")
-def get_toolkit():
+def get_toolkit(request: Request):
+    etag = _toolkit_etag()
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
     toolkit = load_toolkit()
-    return toolkit.as_dict()
+    return Response(content=toolkit.as_json(), media_type="application/json", headers={"ETag": etag})
 
 
 @app.post("/select")
 def post_select(payload: dict):
-    toolkit = load_toolkit()
-    selected = select_tools(
-        toolkit,
-        tags=payload.get("tags", []),
-        visual_texture=payload.get("visual_texture"),
-        contrarian=payload.get("contrarian", False),
-    )
-    state = workspace_state.record_selection([tool.__dict__ for tool in selected])
-    return {"selected": [tool.__dict__ for tool in selected], "state": state}
+    selected = _select(payload)
+    selected_payload = [tool.as_dict() for tool in selected]
+    state = workspace_state.record_selection(selected_payload)
+    return {"selected": selected_payload, "state": state}
 
 
 @app.post("/angles")
-def post_angles(payload: dict, background_tasks: BackgroundTasks):
-    toolkit = load_toolkit()
-    selection = select_tools(
-        toolkit,
-        tags=payload.get("tags", []),
-        visual_texture=payload.get("visual_texture"),
-        contrarian=payload.get("contrarian", False),
-    )
+async def post_angles(payload: dict):
+    selection = _selection_from_ids(payload.get("selection_ids") or [])
+    if not selection:
+        selection = _select(payload)
 
     role = payload.get("role") or "Creator"
     context = payload.get("context") or ""
     contrarian = payload.get("contrarian", False)
 
-    def _generate_and_store():
-        angles = generate_comedic_angles(role, context, selection, contrarian=contrarian)
-        workspace_state.record_angles([angle.as_dict() for angle in angles])
-
-    background_tasks.add_task(_generate_and_store)
+    _angle_queue.put_nowait((role, context, selection, contrarian))
     return {"message": "Angle generation enqueued", "count": len(selection)}
 
 